@@ -1,4 +1,4 @@
-import os, warnings, gym, numpy as np, time
+import os, argparse, warnings, gym, numpy as np, time
 from multiprocessing import Pool, cpu_count
 import logging
 
@@ -26,6 +26,8 @@ def _run_variant(
     seed_offset: int,
     delay_ms: int = 0,          
     skip: int = 12,              
+    seed_idx: int = 0,
+    resume: bool = False,
 ):
     """
     Run one Q-learning variant in its own process.
@@ -42,6 +44,10 @@ def _run_variant(
         Milliseconds to sleep before env creation (prevents DLL race).
     skip : int, optional
         Frame-skip factor passed to env_utils.make_env().
+    seed_idx : int, optional
+        Repeat index of this variant; seeds > 0 save to "<name>_seed<k>".
+    resume : bool, optional
+        Continue from the run's latest checkpoint instead of starting over.
 
     Returns
     -------
@@ -57,14 +63,22 @@ def _run_variant(
 
     rng = np.random.default_rng(C.SEED + seed_offset)
 
-    returns = train.train_variant(name, hp, rng, env)
+    run_name = name if seed_idx == 0 else f"{name}_seed{seed_idx}"
+    returns = train.train_variant(run_name, hp, rng, env, resume=resume)
 
     env.close()
     elapsed = time.perf_counter() - start
-    log(f"Variant {name} finished in {elapsed:.1f}s (mean={np.mean(returns):.2f})")
+    log(f"Variant {run_name} finished in {elapsed:.1f}s (mean={np.mean(returns):.2f})")
     return name, returns, elapsed
 
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--resume", action="store_true",
+                   help="restart every variant from its latest checkpoint")
+    return p.parse_args()
+
 def main():
+    args = parse_args()
     grand_start = time.perf_counter()
 
     log("Running random-policy baseline …")
@@ -74,33 +88,38 @@ def main():
     base_mean = base_returns.mean()
     log(f"Baseline done in {baseline_time:5.1f}s  |  µ = {base_mean:.2f}")
 
-    curves, variant_times = {}, {}
-    items       = list(C.VARIANTS.items())
-    max_workers = min(cpu_count(), len(items))
-    log(f"Launching {len(items)} variants on {max_workers} worker processes")
-
-    tasks = [
-        (vname, hp, i * 10_000, i * 250) 
-        for i, (vname, hp) in enumerate(C.VARIANTS.items())
-    ]
-
-    with Pool(processes=min(cpu_count(), len(tasks))) as pool:
+    runs, variant_times = {}, {}
+    max_workers = min(cpu_count(), len(C.VARIANTS) * C.SEEDS_PER_VARIANT)
+    tasks = []
+    for i, (vname, hp) in enumerate(C.VARIANTS.items()):
+        for s in range(C.SEEDS_PER_VARIANT):
+            # stagger only the workers that start together
+            delay = (len(tasks) % max_workers) * 250
+            tasks.append((vname, hp, i * 10_000 + s * 100, delay, 12, s,
+                          args.resume))
+    log(f"Launching {len(C.VARIANTS)} variants × {C.SEEDS_PER_VARIANT} seeds "
+        f"on {max_workers} worker processes")
+
+    with Pool(processes=max_workers) as pool:
         for name, rets, elapsed in pool.starmap(_run_variant, tasks):
-            curves[name] = rets
-            variant_times[name] = elapsed
+            runs.setdefault(name, []).append(rets)
+            variant_times.setdefault(name, []).append(elapsed)
             log(f"{name:<15s} finished in {elapsed:5.1f}s (µ={np.mean(rets):7.2f})")
 
-    visualize.save_combined(base_mean, curves)
-    visualize.save_per_variant(base_mean, curves)
+    # (seeds, episodes) per variant; visualize aggregates to mean ± CI
+    curves = {name: np.stack(r) for name, r in runs.items()}
+
+    visualize.save_all_plots(base_mean, curves, win=50)
     visualize.save_metrics(base_mean, curves, C.VARIANTS)
-    visualize.save_smoothed_plots(curves, win=50)
 
     total_time = time.perf_counter() - grand_start
     log("All artefacts saved to ./results/")
     log("Timing summary:")
     log(f"    baseline        : {baseline_time:6.1f} s")
-    for n, t in variant_times.items():
-        log(f"    {n:<15s}: {t:6.1f} s")
+    for n, ts in variant_times.items():
+        # seeds run in parallel: slowest seed ≈ wall time, sum = CPU time
+        log(f"    {n:<15s}: {max(ts):6.1f} s slowest seed "
+            f"({sum(ts):.1f} s over {len(ts)} seeds)")
     log(f"    total runtime   : {total_time:6.1f} s")
 
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+"""
+Resume round-trip: a run interrupted mid-training and restarted with
+``resume=True`` must end with the same returns and Q-table as a run that
+was never interrupted.  Uses a tiny stub instead of the NES emulator.
+"""
+import pickle, threading
+import numpy as np
+import pytest
+
+from tetris_rl import config as C, train
+
+HP = C.VARIANTS["q_fast_decay"] | dict(decay_after=20)
+
+
+class StubEnv:
+    """Random boards driven only by the per-episode seed."""
+    def __init__(self, crash_after: int | None = None):
+        self.crash_after = crash_after
+        self.steps = 0
+
+    @property
+    def unwrapped(self):
+        return self
+
+    def seed(self, seed):
+        self._rng = np.random.default_rng(seed)
+
+    def reset(self):
+        self._t, self._lines = 0, 0
+
+    def step(self, action):
+        self.steps += 1
+        if self.crash_after is not None and self.steps > self.crash_after:
+            raise RuntimeError("simulated crash")
+        self._t += 1
+        self._board = (self._rng.random((20, 10)) < 0.05 + 0.02 * action)
+        self._board = self._board.astype(np.uint8)
+        self._lines += int(self._rng.random() < 0.1)
+        done = self._t >= 25 or self._rng.random() < 0.05
+        info = {"current_piece": "IJLOSTZ"[self._rng.integers(7)] + "u",
+                "number_of_lines": self._lines,
+                "board_height": int(self._board.any(axis=1).sum())}
+        return None, 0.0, done, info
+
+    def get_board(self):
+        return self._board
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def small_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(C, "Q_LEARNING_EPISODES", 40)
+    monkeypatch.setattr(C, "MAX_FRAMES", 10)   # truncation leaves read-only rows
+    monkeypatch.setattr(C, "CHECKPOINT_EVERY", 3)
+    monkeypatch.setattr(C, "CHECKPOINT_COMPACT_EVERY", 2)
+    monkeypatch.setattr(train, "MODELS_DIR", str(tmp_path / "models"))
+    monkeypatch.setattr(train, "CHECKPOINT_DIR", str(tmp_path / "ckpt"))
+    return tmp_path
+
+
+def _train(name, env, resume=False, seed=7):
+    return train.train_variant(name, HP, np.random.default_rng(seed), env,
+                               resume=resume)
+
+
+def _model(tmp_path, name):
+    with open(tmp_path / "models" / f"{name}_model.pkl", "rb") as f:
+        return pickle.load(f)
+
+
+def _join_compactors():
+    # a real crash kills the background compactor; here it must finish
+    for t in threading.enumerate():
+        if t.name.startswith("compact-"):
+            t.join()
+
+
+def test_resume_matches_uninterrupted_run(small_run):
+    full = _train("full", StubEnv())
+
+    with pytest.raises(RuntimeError):
+        _train("crash", StubEnv(crash_after=200))
+    _join_compactors()
+    resumed = _train("crash", StubEnv(), resume=True)
+
+    np.testing.assert_array_equal(resumed, full)
+    a, b = _model(small_run, "full"), _model(small_run, "crash")
+    assert a["hp"] == b["hp"]
+    assert a["Q"].keys() == b["Q"].keys()
+    for k in a["Q"]:
+        np.testing.assert_array_equal(a["Q"][k], b["Q"][k])
+
+
+@pytest.mark.parametrize("field, value", [
+    ("Q_LEARNING_EPISODES", 60),
+    ("MAX_FRAMES", 20),
+])
+def test_resume_refuses_changed_hyperparameters(small_run, monkeypatch,
+                                                field, value):
+    _train("run", StubEnv())
+    monkeypatch.setattr(C, field, value)
+    with pytest.raises(ValueError):
+        _train("run", StubEnv(), resume=True)
+
+
+def test_resume_refuses_changed_seed(small_run):
+    _train("run", StubEnv())
+    with pytest.raises(ValueError):
+        _train("run", StubEnv(), resume=True, seed=8)
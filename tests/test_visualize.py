@@ -0,0 +1,65 @@
+"""
+Numeric helpers behind the plots: smoothing against plain-loop references,
+the seed CI band and pixel-resolution downsampling.
+"""
+import numpy as np
+import pytest
+
+from tetris_rl import visualize as V
+
+RNG  = np.random.default_rng(0)
+RUNS = RNG.normal(-40, 5, (3, 1_000))
+
+
+def _rolling_ref(y, win):
+    return np.array([y[max(0, t - win + 1):t + 1].mean() for t in range(len(y))])
+
+
+def _ewma_ref(y, alpha):
+    out = [y[0]]
+    for v in y[1:]:
+        out.append((1 - alpha) * out[-1] + alpha * v)
+    return np.array(out)
+
+
+@pytest.mark.parametrize("win", [1, 50, 5_000])
+def test_rolling_mean_matches_loop(win):
+    got = V._rolling_mean(RUNS, win)
+    for seed, y in enumerate(RUNS):
+        np.testing.assert_allclose(got[seed], _rolling_ref(y, win))
+
+
+def test_ewma_matches_loop():
+    got = V._ewma(RUNS, 0.1)
+    for seed, y in enumerate(RUNS):
+        np.testing.assert_allclose(got[seed], _ewma_ref(y, 0.1))
+
+
+def test_single_seed_ci_has_zero_width():
+    mean, lo, hi = V._mean_ci(RUNS[:1])
+    np.testing.assert_array_equal(mean, RUNS[0])
+    np.testing.assert_array_equal(lo, hi)
+
+
+def test_ci_uses_student_t():
+    mean, lo, hi = V._mean_ci(RUNS)
+    se = RUNS.std(axis=0, ddof=1) / np.sqrt(3)
+    np.testing.assert_allclose(hi - mean, 4.303 * se)
+
+
+@pytest.mark.parametrize("df, t", [(1, 12.706), (21, 2.080), (35, 2.042),
+                                   (61, 2.000), (10_000, 1.980)])
+def test_t_quantile_never_too_small(df, t):
+    assert V._t975(df) == t
+
+
+@pytest.mark.parametrize("n", [10, 15_000])
+def test_downsampling_respects_pixel_width(n):
+    y  = RNG.normal(size=n)
+    px = int(V.FIG_STD[0] * V.DPI)
+    assert len(V._bucket_edges(n, V.FIG_STD)) == min(n, px)
+    x, yl = V._line(y, V.FIG_STD)
+    assert len(x) == len(yl) <= px
+    x, ye = V._envelope(y, V.FIG_STD)
+    assert len(x) == len(ye) <= 2 * px     # one min + one max per column
+    assert ye.min() == y.min() and ye.max() == y.max()
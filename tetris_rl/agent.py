@@ -6,6 +6,18 @@ import os, pickle
 from . import config as C
 from . import env_utils as eu
 
+class QTable(defaultdict):
+    """Zero-initialised Q rows that remember every state created or updated
+    since the last checkpoint (``dirty``)."""
+    def __init__(self):
+        super().__init__(lambda: np.zeros(eu.N_ACTIONS, dtype=np.float32))
+        self.dirty = set()
+
+    def __missing__(self, key):
+        self.dirty.add(key)
+        return super().__missing__(key)
+
+
 class QLearningAgent:
     def __init__(self, rng: np.random.Generator, **hp):
         self.alpha        = hp.get("alpha", 0.10)
@@ -15,7 +27,7 @@ class QLearningAgent:
         self.eps_decay    = hp.get("eps_decay", 0.995)
         self.decay_after  = hp.get("decay_after", 10_000)
 
-        self.Q   = defaultdict(lambda: np.zeros(eu.N_ACTIONS, dtype=np.float32))
+        self.Q   = QTable()
         self.rng = rng
         self.frames_seen = 0
 
@@ -28,6 +40,7 @@ class QLearningAgent:
         best_next = 0.0 if terminated else np.max(self.Q[s_next])
         td_target = r + self.gamma * best_next
         self.Q[s][a] += self.alpha * (td_target - self.Q[s][a])
+        self.Q.dirty.add(s)
     
     def play_episode(self, env):
         """
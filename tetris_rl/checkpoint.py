@@ -0,0 +1,247 @@
+"""
+Incremental delta checkpoints for long training runs.
+
+Layout of ``results/checkpoints/<run>/``::
+
+    base_<seq>.pkl   full snapshot of everything up to segment <seq>
+    seg_<seq>.pkl    append-only delta: Q rows created/updated since <seq-1>,
+                     agent ε/frame counter, RNG state, new returns
+
+Every file also records the run's ``meta`` (hyper-parameters, target
+episode count, frames per episode, RNG seed); resuming under different
+settings is refused.
+
+Every file is written to a temp name, fsync'ed and renamed, so a crash
+never leaves a half-written file behind.  The latest consistent checkpoint
+is the newest base plus the unbroken run of segments after it.  Every
+``compact_every`` segments a background thread folds them into a new base
+and deletes the old files; it only reads finished files, never the live
+agent, so training does not wait on it.
+"""
+from __future__ import annotations
+import os, re, pickle, logging, threading, time, numpy as np
+
+from . import config as C
+from . import env_utils as eu
+from . import agent as ag
+
+_FILE_RE = re.compile(r"^(base|seg)_(\d{6})\.pkl$")
+log = logging.getLogger(__name__)
+
+
+def _dump(path: str, payload: dict) -> int:
+    """Atomically pickle *payload* to *path*; return bytes written."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+        nbytes = f.tell()
+    os.replace(tmp, path)
+    return nbytes
+
+
+def _load(path: str) -> dict | None:
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def _pack_q(q: dict) -> tuple[np.ndarray, np.ndarray]:
+    """Q rows → compact (int16 state keys, float32 values) arrays."""
+    if not q:
+        return (np.empty((0, 0), dtype=np.int16),
+                np.empty((0, eu.N_ACTIONS), dtype=np.float32))
+    return (np.asarray(list(q.keys()), dtype=np.int16),
+            np.stack(list(q.values())).astype(np.float32, copy=False))
+
+
+def _unpack_q(keys: np.ndarray, values: np.ndarray) -> dict:
+    return dict(zip(map(tuple, keys.tolist()), values))
+
+
+class CheckpointStore:
+    """Delta checkpoints of one training run (one variant / seed)."""
+
+    def __init__(self, root: str, run: str, meta: dict | None = None,
+                 compact_every: int | None = None):
+        self.dir           = os.path.join(root, run)
+        self.meta          = meta or {}
+        self.compact_every = compact_every or C.CHECKPOINT_COMPACT_EVERY
+        self.seq           = 0          # last segment written / loaded
+        self.episode       = 0          # episodes covered by self.seq
+        self._base_seq     = 0
+        self._compactor: threading.Thread | None = None
+        os.makedirs(self.dir, exist_ok=True)
+
+    # ── discovery ───────────────────────────────────────────────────────
+    def _files(self) -> dict[str, dict[int, str]]:
+        found = {"base": {}, "seg": {}}
+        for fn in os.listdir(self.dir):
+            m = _FILE_RE.match(fn)
+            if m:
+                found[m.group(1)][int(m.group(2))] = os.path.join(self.dir, fn)
+        return found
+
+    def _path(self, kind: str, seq: int) -> str:
+        return os.path.join(self.dir, f"{kind}_{seq:06d}.pkl")
+
+    def clear(self):
+        """Drop all checkpoints (fresh, non-resumed run)."""
+        self.wait()
+        for fn in os.listdir(self.dir):
+            os.remove(os.path.join(self.dir, fn))
+        self.seq = self.episode = self._base_seq = 0
+
+    # ── write ───────────────────────────────────────────────────────────
+    def write(self, agent, episode: int, returns: list[float]) -> dict:
+        """
+        Append a delta segment for everything since the last checkpoint.
+
+        Returns the interval's write cost: ``states``, ``bytes``, ``secs``.
+        """
+        t0 = time.perf_counter()
+        delta = {s: agent.Q[s] for s in agent.Q.dirty}
+        keys, values = _pack_q(delta)
+        payload = {
+            "seq"    : self.seq + 1,
+            "episode": episode,
+            "keys"   : keys,
+            "values" : values,
+            "agent"  : dict(eps=agent.eps, frames_seen=agent.frames_seen),
+            "rng"    : agent.rng.bit_generator.state,
+            "meta"   : self.meta,
+            "returns": np.asarray(returns[self.episode:episode], dtype=np.float64),
+        }
+        nbytes = _dump(self._path("seg", self.seq + 1), payload)
+        agent.Q.dirty.clear()
+        self.seq, self.episode = self.seq + 1, episode
+
+        if self.seq - self._base_seq >= self.compact_every:
+            self.compact(background=True)
+
+        return dict(states=len(delta), bytes=nbytes,
+                    secs=time.perf_counter() - t0)
+
+    # ── compaction ──────────────────────────────────────────────────────
+    def compact(self, background: bool = False):
+        """Fold the base and all finished segments into a new base."""
+        if self._compactor is not None and self._compactor.is_alive():
+            if background:
+                return                  # next interval will pick them up
+            self.wait()
+        if background:
+            self._compactor = threading.Thread(
+                target=self._compact, args=(self.seq,), daemon=True,
+                name=f"compact-{os.path.basename(self.dir)}")
+            self._compactor.start()
+        else:
+            self._compact(self.seq)
+
+    def _compact(self, upto: int):
+        state = self._merge(upto)
+        if state is None or state["seq"] != upto:
+            # _base_seq stays put, so the next interval retries
+            log.warning("Compaction of %s up to segment %d failed: chain "
+                        "ends at %s", self.dir, upto,
+                        state and state["seq"])
+            return
+        keys, values = _pack_q(state.pop("Q"))
+        _dump(self._path("base", upto), {**state, "keys": keys, "values": values})
+        self._base_seq = upto
+        files = self._files()
+        for kind in ("base", "seg"):
+            for seq, path in files[kind].items():
+                if seq < upto or (kind == "seg" and seq == upto):
+                    os.remove(path)
+
+    def wait(self):
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+    def close(self):
+        """Final synchronous compaction → a single base file on disk."""
+        self.wait()
+        if self.seq > self._base_seq:
+            self.compact()
+        self.wait()
+
+    # ── load ────────────────────────────────────────────────────────────
+    def _merge(self, upto: int | None = None) -> dict | None:
+        """Newest base + the unbroken chain of segments after it."""
+        files = self._files()
+        state = None
+        for seq in sorted(files["base"], reverse=True):
+            base = _load(files["base"][seq])
+            if base is not None:
+                state = {**base, "Q": _unpack_q(base["keys"], base["values"]),
+                         "returns": [base["returns"]]}
+                del state["keys"], state["values"]
+                break
+
+        seq = state["seq"] if state else 0
+        while upto is None or seq < upto:
+            path = files["seg"].get(seq + 1)
+            seg  = _load(path) if path else None
+            if seg is None:
+                break
+            if state is None:
+                state = {"Q": {}, "returns": []}
+            state["Q"].update(_unpack_q(seg["keys"], seg["values"]))
+            state["returns"].append(seg["returns"])
+            for k in ("seq", "episode", "agent", "rng", "meta"):
+                state[k] = seg[k]
+            seq += 1
+
+        if state is not None:
+            state["returns"] = np.concatenate(state["returns"])
+        return state
+
+    def load(self) -> dict | None:
+        """
+        Latest consistent checkpoint, or None if there is nothing to resume.
+
+        Keys: ``episode``, ``Q`` (dict), ``agent`` (eps, frames_seen),
+        ``rng`` (bit-generator state), ``returns`` (float64 array),
+        ``meta``.
+        """
+        self.wait()
+        state = self._merge()
+        if state is None:
+            self.clear()
+            return None
+        # anything past the consistent chain would be overwritten anyway
+        files = self._files()
+        for kind in ("base", "seg"):
+            for seq, path in files[kind].items():
+                if seq > state["seq"]:
+                    os.remove(path)
+        self.seq = self._base_seq = state["seq"]
+        self.episode = state["episode"]
+        return state
+
+    def restore(self, agent) -> tuple[int, list[float]]:
+        """
+        Load into *agent* (and its RNG); return (episode, returns).
+
+        Raises ValueError if the checkpoint was written under a different
+        ``meta`` (edited hyper-parameters, episode/frame limits or seed).
+        """
+        state = self.load()
+        if state is None:
+            return 0, []
+        if state["meta"] != self.meta:
+            raise ValueError(
+                f"Checkpoint in {self.dir} was written with {state['meta']}, "
+                f"current run uses {self.meta}; run without --resume to "
+                f"start over.")
+        agent.Q = ag.QTable()
+        for k, v in state["Q"].items():
+            agent.Q[k] = v.copy()
+        agent.eps         = state["agent"]["eps"]
+        agent.frames_seen = state["agent"]["frames_seen"]
+        agent.rng.bit_generator.state = state["rng"]
+        return state["episode"], state["returns"].tolist()
@@ -5,6 +5,7 @@ SEED = 0
 BASELINE_EPISODES = 250
 Q_LEARNING_EPISODES = 15_000
 MAX_FRAMES = 10_000
+SEEDS_PER_VARIANT = 1      # >1 → plots show seed mean ± 95 % CI
 
 VARIANTS = {
     # Drops ε from 1.0 → 0.90 each 10 000-frame episode
@@ -39,3 +40,7 @@ VARIANTS = {
 }
 
 PRINT_EVERY_TRAIN = 250
+
+# Delta checkpoint every N episodes; fold segments into a base every M
+CHECKPOINT_EVERY = 250
+CHECKPOINT_COMPACT_EVERY = 10
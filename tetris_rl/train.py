@@ -1,16 +1,18 @@
 from __future__ import annotations
 import os, numpy as np
-from tqdm import trange, tqdm
-from . import env_utils as eu, config as C, agent as ag
+from tqdm import tqdm
+from . import env_utils as eu, config as C, agent as ag, checkpoint as ck
 
 RESULTS_DIR = "results"
 MODELS_DIR = os.path.join(RESULTS_DIR, "models")
+CHECKPOINT_DIR = os.path.join(RESULTS_DIR, "checkpoints")
 
 def train_variant(
     name: str,
     hp  : dict,
     rng,
     env = None,                 
+    resume: bool = False,
 ) -> np.ndarray:
     """
     Train one Q-learning agent and return its per-episode returns.
@@ -22,9 +24,15 @@ def train_variant(
     rng             – numpy.random.Generator
     env  : gym.Env | None
         If None, a fresh env is created and closed internally.
+    resume : bool
+        Continue from the latest checkpoint in results/checkpoints/<variant>/
+        (Q-table, ε, frame counter, RNG state and returns so far).  The
+        result is identical to an uninterrupted run.  If False, old
+        checkpoints of this variant are discarded.
 
     Side-effects
     ------------
+    • Writes a delta checkpoint every C.CHECKPOINT_EVERY episodes
     • Saves pickle  results/<variant>_model.pkl
     • Returns np.ndarray of length C.Q_LEARNING_EPISODES
     """
@@ -33,10 +41,25 @@ def train_variant(
         env = eu.make_env(skip=8)        
 
     learner = ag.QLearningAgent(rng, **hp)
-    returns = []
+    store   = ck.CheckpointStore(
+        CHECKPOINT_DIR, name,
+        meta=dict(hp=dict(hp), episodes=C.Q_LEARNING_EPISODES,
+                  max_frames=C.MAX_FRAMES,
+                  seed=rng.bit_generator.seed_seq.entropy),
+    )
+    if resume:
+        start, returns = store.restore(learner)
+        if start:
+            tqdm.write(f"{name:<12} | resumed at ep {start} | ε={learner.eps:5.3f}")
+    else:
+        store.clear()
+        start, returns = 0, []
+    ckpt_secs = 0.0
 
-    for ep in trange(
-        C.Q_LEARNING_EPISODES,
+    for ep in tqdm(
+        range(start, C.Q_LEARNING_EPISODES),
+        initial=start,
+        total=C.Q_LEARNING_EPISODES,
         desc=f"Training ({name})",
         ncols=80,
         leave=False,
@@ -44,6 +67,17 @@ def train_variant(
         G = learner.play_episode(env)
         returns.append(G)
 
+        if ((ep + 1) % C.CHECKPOINT_EVERY == 0
+                or ep + 1 == C.Q_LEARNING_EPISODES):
+            cost = store.write(learner, ep + 1, returns)
+            ckpt_secs += cost["secs"]
+            tqdm.write(
+                f"{name:<12} | ckpt {store.seq:4d} @ ep {ep+1} | "
+                f"{cost['states']:6d} Δstates | "
+                f"{cost['bytes'] / 1024:8.1f} KB | "
+                f"{cost['secs'] * 1000:7.1f} ms"
+            )
+
         if (ep + 1) % C.PRINT_EVERY_TRAIN == 0:
             mean_k = np.mean(returns[-C.PRINT_EVERY_TRAIN:])
             tqdm.write(
@@ -53,6 +87,10 @@ def train_variant(
                 f"µ{C.PRINT_EVERY_TRAIN:02d}={mean_k:8.2f}"
             )
 
+    store.close()
+    if ckpt_secs:
+        tqdm.write(f"{name:<12} | checkpoint writes total {ckpt_secs:.2f}s")
+
     if own_env:
         env.close()
 
@@ -1,63 +1,256 @@
 # tetris_rl/visualize.py  ─────────────────────────────────────────────────
-import os, csv, json, numpy as np, pandas as pd, matplotlib.pyplot as plt
+"""
+Plots, CSV and JSON artefacts.
+
+Every curve may be a 1-D array (one run) or a 2-D ``(seeds, episodes)``
+stack.  All statistics are computed with vectorised NumPy over the whole
+stack, reduced to the figure's pixel width and only then handed to
+matplotlib, so figure cost no longer grows with the episode count.
+Figures are rendered in worker processes on the non-interactive Agg backend.
+"""
+import os, csv, json, numpy as np, matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from multiprocessing import Pool, cpu_count
+
 RESULTS_DIR = "results"
 PLOTS_DIR  = os.path.join(RESULTS_DIR, "plots")
 DATA_DIR   = os.path.join(RESULTS_DIR, "data")
 
-def _ensure_dir(path=RESULTS_DIR):
-    if not os.path.exists(path):
-        os.makedirs(path)
+DPI      = 100
 
-def save_combined(baseline_mean: float, curves: dict[str, np.ndarray]):
-    _ensure_dir()
-    plt.figure(figsize=(9,5))
-    x = np.arange(1, len(next(iter(curves.values())))+1)
-    for name, ret in curves.items():
-        plt.plot(x, ret - baseline_mean, label=name)
-    plt.axhline(0, color='red', ls='--')
-    plt.xlabel("Episode");  plt.ylabel("Reward − baseline µ")
-    plt.title("All Q-learning variants vs baseline")
-    plt.legend(); plt.grid(); plt.tight_layout()
-    plt.savefig(os.path.join(PLOTS_DIR, "combined.png"))
-    plt.close()
-
-
-def save_per_variant(baseline_mean: float, curves: dict[str, np.ndarray]):
-    _ensure_dir()
-    x = np.arange(1, len(next(iter(curves.values())))+1)
+# Student-t 0.975 quantiles by degrees of freedom (seeds − 1)
+_T975 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447,
+         7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228, 11: 2.201, 12: 2.179,
+         13: 2.160, 14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110, 18: 2.101,
+         19: 2.093, 20: 2.086, 21: 2.080, 22: 2.074, 23: 2.069, 24: 2.064,
+         25: 2.060, 26: 2.056, 27: 2.052, 28: 2.048, 29: 2.045, 30: 2.042,
+         40: 2.021, 60: 2.000, 120: 1.980}
+
+FIG_WIDE = (10, 5)
+FIG_STD  = (9, 5)
+FIG_SM   = (8, 4)
+
+def _ensure_dir(*paths):
+    for path in paths or (RESULTS_DIR,):
+        os.makedirs(path, exist_ok=True)
+
+# ── statistics ──────────────────────────────────────────────────────────
+def _as_runs(ret) -> np.ndarray:
+    """Return curve as a float64 ``(seeds, episodes)`` array."""
+    return np.atleast_2d(np.asarray(ret, dtype=np.float64))
+
+
+def _rolling_mean(runs: np.ndarray, win: int) -> np.ndarray:
+    """Trailing mean with ``min_periods=1`` along the episode axis."""
+    csum = np.cumsum(runs, axis=1)
+    out  = csum.copy()
+    out[:, win:] -= csum[:, :-win]
+    n = np.minimum(np.arange(1, runs.shape[1] + 1), win)
+    return out / n
+
+
+def _ewma(runs: np.ndarray, alpha: float) -> np.ndarray:
+    """``adjust=False`` EWMA; the recurrence is vectorised across seeds."""
+    out = np.empty_like(runs)
+    out[:, 0] = runs[:, 0]
+    keep = 1.0 - alpha
+    for t in range(1, runs.shape[1]):
+        out[:, t] = keep * out[:, t - 1] + alpha * runs[:, t]
+    return out
+
+
+def _smooth(runs: np.ndarray, win: int, ewma: float | None) -> np.ndarray:
+    if ewma is not None:
+        return _ewma(runs, ewma)
+    return _rolling_mean(runs, win)
+
+
+def _t975(df: int) -> float:
+    """
+    t quantile for *df*.  Exact up to df=30; above that the next *lower*
+    tabulated df is used, whose larger quantile keeps the band conservative.
+    """
+    return _T975[max(k for k in _T975 if k <= max(df, 1))]
+
+
+def _mean_ci(runs: np.ndarray):
+    """Seed mean and 95 % t-interval ``mean ± t·SE`` (zero width for 1 seed)."""
+    mean = runs.mean(axis=0)
+    n    = runs.shape[0]
+    if n < 2:
+        return mean, mean, mean
+    half = _t975(n - 1) * runs.std(axis=0, ddof=1) / np.sqrt(n)
+    return mean, mean - half, mean + half
+
+# ── downsampling ────────────────────────────────────────────────────────
+def _bucket_edges(n: int, figsize) -> np.ndarray:
+    """Start index of every pixel column (at most one bucket per episode)."""
+    px = int(figsize[0] * DPI)
+    return np.unique(np.linspace(0, n, min(n, px) + 1, dtype=np.int64)[:-1])
+
+
+def _reduce(y: np.ndarray, edges: np.ndarray, how: str) -> np.ndarray:
+    if how == "min":
+        return np.minimum.reduceat(y, edges)
+    if how == "max":
+        return np.maximum.reduceat(y, edges)
+    counts = np.diff(np.append(edges, len(y)))
+    return np.add.reduceat(y, edges) / counts
+
+
+def _line(y: np.ndarray, figsize) -> tuple[np.ndarray, np.ndarray]:
+    """Bucket-mean a smooth curve down to one point per pixel column."""
+    edges = _bucket_edges(len(y), figsize)
+    x = _reduce(np.arange(1, len(y) + 1, dtype=np.float64), edges, "mean")
+    return x, _reduce(y, edges, "mean")
+
+
+def _envelope(y: np.ndarray, figsize) -> tuple[np.ndarray, np.ndarray]:
+    """Min/max decimation of a noisy curve: keeps every spike visible."""
+    edges = _bucket_edges(len(y), figsize)
+    x  = np.repeat(edges + 1, 2).astype(np.float64)
+    yy = np.empty(2 * len(edges))
+    yy[0::2] = _reduce(y, edges, "min")
+    yy[1::2] = _reduce(y, edges, "max")
+    return x, yy
+
+
+def _band(lo: np.ndarray, hi: np.ndarray, figsize):
+    edges = _bucket_edges(len(lo), figsize)
+    x = _reduce(np.arange(1, len(lo) + 1, dtype=np.float64), edges, "mean")
+    return x, _reduce(lo, edges, "min"), _reduce(hi, edges, "max")
+
+# ── figure specs & rendering ────────────────────────────────────────────
+def _spec(path, title, ylabel, figsize, hline=None):
+    """Plain-data description of one figure (cheap to send to a worker)."""
+    return dict(path=path, title=title, xlabel="Episode", ylabel=ylabel,
+                figsize=figsize, hline=hline, lines=[], bands=[])
+
+
+def _add_curve(spec: dict, mean, lo, hi, label: str, raw: bool = False, **kw):
+    """
+    Add a downsampled mean line (+ CI band if the run has >1 seed).
+    Raw (unsmoothed) means are min/max-decimated so spikes survive.
+    """
+    figsize = spec["figsize"]
+    reduce  = _envelope if raw else _line
+    spec["lines"].append((*reduce(mean, figsize), label, kw))
+    if not np.array_equal(lo, hi):
+        spec["bands"].append((*_band(lo, hi, figsize), kw.get("color")))
+
+
+def _render(spec: dict) -> str:
+    fig, ax = plt.subplots(figsize=spec["figsize"], dpi=DPI)
+    for x, lo, hi, color in spec["bands"]:
+        ax.fill_between(x, lo, hi, alpha=0.2, color=color, lw=0)
+    for x, y, label, kw in spec["lines"]:
+        ax.plot(x, y, label=label, **kw)
+    if spec["hline"] is not None:
+        ax.axhline(spec["hline"], color='red', ls='--')
+    ax.set_title(spec["title"])
+    ax.set_xlabel(spec["xlabel"]); ax.set_ylabel(spec["ylabel"])
+    ax.legend(); ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(spec["path"], dpi=DPI)
+    plt.close(fig)
+    return spec["path"]
+
+
+def _render_many(specs: list[dict], workers: int | None = None):
+    """Render figures in parallel; ``workers=1`` renders in-process."""
+    _ensure_dir(PLOTS_DIR)
+    workers = min(workers or cpu_count(), len(specs))
+    if workers <= 1:
+        return [_render(s) for s in specs]
+    with Pool(processes=workers) as pool:
+        return pool.map(_render, specs)
+
+# ── spec builders ───────────────────────────────────────────────────────
+def _combined_specs(baseline_mean: float, curves: dict[str, np.ndarray]):
+    spec = _spec(os.path.join(PLOTS_DIR, "combined.png"),
+                 "All Q-learning variants vs baseline",
+                 "Reward − baseline µ", FIG_STD, hline=0)
+    for i, (name, ret) in enumerate(curves.items()):
+        mean, lo, hi = _mean_ci(_as_runs(ret) - baseline_mean)
+        _add_curve(spec, mean, lo, hi, name, raw=True, color=f"C{i}", lw=0.8)
+    return [spec]
+
+
+def _per_variant_specs(baseline_mean: float, curves: dict[str, np.ndarray]):
+    specs = []
     for name, ret in curves.items():
-        plt.figure(figsize=(9,5))
-        plt.plot(x, ret - baseline_mean, label=name)
-        plt.axhline(0, color='red', ls='--')
-        plt.xlabel("Episode"); plt.ylabel("Reward − baseline µ")
-        plt.title(f"{name} vs baseline")
-        plt.legend(); plt.grid(); plt.tight_layout()
-        plt.savefig(os.path.join(PLOTS_DIR, f"{name}.png"))
-        plt.close()
+        spec = _spec(os.path.join(PLOTS_DIR, f"{name}.png"),
+                     f"{name} vs baseline", "Reward − baseline µ",
+                     FIG_STD, hline=0)
+        mean, lo, hi = _mean_ci(_as_runs(ret) - baseline_mean)
+        _add_curve(spec, mean, lo, hi, name, raw=True, color="C0", lw=0.8)
+        specs.append(spec)
+    return specs
+
+
+def _smoothed_specs(curves: dict[str, np.ndarray],
+                    win: int, ewma: float | None):
+    title = (f"Rolling mean (w={win})" if ewma is None
+             else f"EWMA (α={ewma})")
+    comb  = _spec(os.path.join(PLOTS_DIR, "combined_smooth.png"),
+                  title, "Reward", FIG_WIDE)
+    specs = [comb]
+
+    for i, (name, ret) in enumerate(curves.items()):
+        runs = _as_runs(ret)
+        mean, lo, hi = _mean_ci(_smooth(runs, win, ewma))
+
+        # combined
+        _add_curve(comb, mean, lo, hi, name, color=f"C{i}")
+
+        # individual
+        spec = _spec(os.path.join(PLOTS_DIR, f"{name}_smooth.png"),
+                     f"{name} – smoothed learning curve", "Reward", FIG_SM)
+        spec["lines"].append((*_envelope(runs.mean(axis=0), FIG_SM), "raw",
+                              dict(color="C0", alpha=0.25)))
+        _add_curve(spec, mean, lo, hi, "smoothed", color="C1", lw=2)
+        specs.append(spec)
+    return specs
+
+# ── public API ──────────────────────────────────────────────────────────
+def save_combined(baseline_mean: float, curves: dict[str, np.ndarray]):
+    _render_many(_combined_specs(baseline_mean, curves), workers=1)
+
+
+def save_per_variant(baseline_mean: float, curves: dict[str, np.ndarray],
+                     workers: int | None = None):
+    _render_many(_per_variant_specs(baseline_mean, curves), workers)
+
 
 def save_metrics(baseline_mean: float,
                  curves: dict[str, np.ndarray],
                  hp_grid : dict[str, dict]):
-    _ensure_dir()
+    _ensure_dir(DATA_DIR)
     summary = []
 
     for name, ret in curves.items():
-        adv  = ret - baseline_mean
+        runs = _as_runs(ret)
+        mean = runs.mean(axis=0)
+        adv  = mean - baseline_mean
         csv_path = os.path.join(DATA_DIR, f"{name}_episodes.csv")
         with open(csv_path, "w", newline="") as f:
             w = csv.writer(f)
             w.writerow(["episode", "reward", "advantage"])
-            for ep, (r, a) in enumerate(zip(ret, adv), start=1):
-                w.writerow([ep, float(r), float(a)])
+            w.writerows(zip(range(1, len(mean) + 1),
+                            mean.tolist(), adv.tolist()))
+        # raw (seeds, episodes) returns, enough to recompute the CI bands
+        np.save(os.path.join(DATA_DIR, f"{name}_seeds.npy"), runs)
 
         summary.append({
             "variant"        : name,
             "hyperparameters": hp_grid[name],
-            "episodes"       : len(ret),
-            "mean_reward"    : float(np.mean(ret)),
+            "seeds"          : runs.shape[0],
+            "episodes"       : runs.shape[1],
+            "mean_reward"    : float(np.mean(mean)),
             "mean_advantage" : float(np.mean(adv)),
-            "final_reward"   : float(ret[-1]),
-            "best_reward"    : float(np.max(ret)),
+            "final_reward"   : float(mean[-1]),
+            "best_reward"    : float(np.max(mean)),
             "baseline_mean"  : float(baseline_mean),
         })
 
@@ -65,57 +258,41 @@ def save_metrics(baseline_mean: float,
         json.dump(summary, jf, indent=2)
 
 
-def _smooth(series: pd.Series, win: int, ewma: float | None):
-    if ewma is not None:
-        return series.ewm(alpha=ewma, adjust=False).mean()
-    return series.rolling(win, min_periods=1).mean()
-
-
 def save_smoothed_plots(curves: dict[str, np.ndarray],
                         win : int = 50,
-                        ewma: float | None = None):
+                        ewma: float | None = None,
+                        workers: int | None = None):
     """
     Create noise-reduced plots for every variant **and** a combined plot.
 
     Parameters
     ----------
     curves : dict[str, np.ndarray]
-        Raw per-episode reward curves.
+        Per-episode reward curves, 1-D or stacked ``(seeds, episodes)``.
     win    : int
         Rolling-mean window (ignored if `ewma` is given).
     ewma   : float | None
         Alpha for exponential smoothing.  Use None to disable.
+    workers : int | None
+        Render processes (default: one per CPU core, 1 = serial).
     """
-    _ensure_dir(PLOTS_DIR)
-
-    combined_fig = plt.figure(figsize=(10,5))
-    ax_comb = combined_fig.add_subplot(1,1,1)
-
-    for name, rewards in curves.items():
-        ep = np.arange(1, len(rewards)+1)
-        df = pd.DataFrame({"episode": ep, "reward": rewards})
-        df["smooth"] = _smooth(df["reward"], win, ewma)
-
-        # combined
-        ax_comb.plot(df["episode"], df["smooth"], label=name)
+    _render_many(_smoothed_specs(curves, win, ewma), workers)
+    print(f"✅  Smoothed plots saved → {PLOTS_DIR}")
 
-        # individual
-        plt.figure(figsize=(8,4))
-        plt.plot(df["episode"], df["reward"],  alpha=0.25, label="raw")
-        plt.plot(df["episode"], df["smooth"], lw=2,      label="smoothed")
-        plt.title(f"{name} – smoothed learning curve")
-        plt.xlabel("Episode"); plt.ylabel("Reward")
-        plt.legend(); plt.grid(True); plt.tight_layout()
-        plt.savefig(os.path.join(PLOTS_DIR, f"{name}_smooth.png"))
-        plt.close()
 
-    title = (f"Rolling mean (w={win})" if ewma is None
-             else f"EWMA (α={ewma})")
-    ax_comb.set_title(title)
-    ax_comb.set_xlabel("Episode"); ax_comb.set_ylabel("Reward")
-    ax_comb.legend(); ax_comb.grid(True)
-    combined_fig.tight_layout()
-    combined_fig.savefig(os.path.join(PLOTS_DIR, "combined_smooth.png"))
-    plt.close(combined_fig)
+def save_all_plots(baseline_mean: float,
+                   curves: dict[str, np.ndarray],
+                   win : int = 50,
+                   ewma: float | None = None,
+                   workers: int | None = None):
+    """
+    Raw + smoothed figures in a single parallel pass.
 
-    print(f"✅  Smoothed plots saved → {PLOTS_DIR}")
+    Equivalent to calling `save_combined`, `save_per_variant` and
+    `save_smoothed_plots`, but all figures share one worker pool.
+    """
+    specs = (_combined_specs(baseline_mean, curves)
+             + _per_variant_specs(baseline_mean, curves)
+             + _smoothed_specs(curves, win, ewma))
+    _render_many(specs, workers)
+    print(f"✅  Plots saved → {PLOTS_DIR}")